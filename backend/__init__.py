@@ -0,0 +1 @@
+"""Real-Time Data Breach Risk Detector backend package"""
@@ -3,36 +3,38 @@ Alert Manager
 Manages security alerts and notifications
 - Generates alerts from detected issues
 - Sends notifications
-- Logs alerts to database
+- Logs alerts to database (batched in the background by alert_writer)
 """
 
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict
-import sys
-import os
+from typing import List, Dict, Optional
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database.db import save_alert
+from backend.database.db import save_alerts_bulk
+from backend.database.batch_writer import BatchWriter
 
 class AlertManager:
     """Manages security alerts and notifications"""
     
-    def __init__(self):
+    def __init__(self, writer: Optional[BatchWriter] = None):
         self.alert_history = []
+        # Shared writer by default, so alerts from every scan coalesce into the same batches
+        self.writer = writer or alert_writer
     
-    def create_alert(self, issue: Dict) -> Dict:
+    def create_alert(self, issue: Dict, timestamp: Optional[str] = None) -> Dict:
         """
         Create an alert from a detected issue
         
         Args:
             issue: Dictionary containing issue details
+            timestamp: ISO timestamp to use (defaults to now)
         
         Returns:
             Alert dictionary
         """
         alert = {
             "id": len(self.alert_history) + 1,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "severity": issue.get('severity', 'INFO'),
             "type": issue.get('type'),
             "description": issue.get('description'),
@@ -41,30 +43,45 @@ class AlertManager:
         
         return alert
     
-    def process_issues(self, all_issues: List[Dict]) -> List[Dict]:
+    def build_alerts(self, issues: List[Dict]) -> List[Dict]:
+        """Create an alert for each issue and print it to the console"""
+        alerts = []
+        
+        # All alerts from one batch of issues share the same timestamp
+        timestamp = datetime.now().isoformat()
+        
+        for issue in issues:
+            alert = self.create_alert(issue, timestamp)
+            
+            # Print to console (for demo purposes)
+            self._print_alert(alert)
+            alerts.append(alert)
+        
+        return alerts
+    
+    async def process_issues(self, all_issues: List[Dict]) -> List[Dict]:
         """
         Process all detected issues and create alerts
         
+        Saving and notifying happen in the background writer, so this
+        returns without waiting on the database
+        
         Args:
             all_issues: List of detected security issues
         
         Returns:
             List of created alerts
         """
-        alerts = []
+        alerts = self.build_alerts(all_issues)
         
-        for issue in all_issues:
-            alert = self.create_alert(issue)
-            alerts.append(alert)
-            
-            # Save to database
-            save_alert(alert)
-            
-            # Print to console (for demo purposes)
-            self._print_alert(alert)
+        await self.queue_alerts(alerts)
+        return alerts
+    
+    async def queue_alerts(self, alerts: List[Dict]):
+        """Queue created alerts for saving to database and notifications"""
+        await self.writer.put_many(alerts)
         
         self.alert_history.extend(alerts)
-        return alerts
     
     def _print_alert(self, alert: Dict):
         """Print alert to console with colored output"""
@@ -92,21 +109,17 @@ class AlertManager:
         Returns:
             Dictionary with counts by severity level
         """
-        summary = {
-            'CRITICAL': 0,
-            'WARNING': 0,
-            'INFO': 0,
+        counts = Counter(alert.get('severity', 'INFO') for alert in alerts)
+        
+        return {
+            'CRITICAL': counts.get('CRITICAL', 0),
+            'WARNING': counts.get('WARNING', 0),
+            'INFO': counts.get('INFO', 0),
             'total': len(alerts)
         }
-        
-        for alert in alerts:
-            severity = alert.get('severity', 'INFO')
-            if severity in summary:
-                summary[severity] += 1
-        
-        return summary
     
-    def send_notification(self, alert: Dict):
+    @staticmethod
+    def send_notification(alert: Dict):
         """
         Send notification for critical alerts
         In real implementation, this would send email/SMS/webhook
@@ -114,3 +127,15 @@ class AlertManager:
         """
         if alert.get('severity') == 'CRITICAL':
             print(f"📧 [SIMULATED] Email notification sent for critical alert: {alert.get('description')}")
+
+
+def _deliver_alerts(alerts: List[Dict]):
+    """Save a batch of queued alerts and send their notifications (runs in a worker thread)"""
+    save_alerts_bulk(alerts)
+    
+    for alert in alerts:
+        AlertManager.send_notification(alert)
+
+
+# Background writer for alerts; started and stopped with the app (see app.py)
+alert_writer = BatchWriter(_deliver_alerts)
@@ -3,22 +3,29 @@ Main FastAPI Application
 Entry point for the Data Breach Risk Detector backend
 """
 
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import sys
-import os
+from fastapi.responses import ORJSONResponse
 
-# Add current directory to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backend.routes.dashboard_routes import router, scan_writer
+from backend.database.db import init_db
+from backend.alerts.alert_manager import alert_writer
+from backend.detectors.runner import shutdown_detector_pool
+from backend.config.settings import LOG_LEVEL
 
-from routes.dashboard_routes import router
-from database.db import init_db
+# Plain messages keep the scan progress log readable on the console
+logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Data Breach Risk Detector API",
     description="Real-time security risk detection system for hackathon demo",
-    version="1.0.0"
+    version="1.0.0",
+    # Scan and alert payloads are large nested dicts; orjson serializes them much faster
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for frontend access
@@ -36,23 +43,39 @@ app.include_router(router, prefix="/api", tags=["Security Scanner"])
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database when server starts"""
+    """Initialize database and start the background alert and scan writers when server starts"""
     init_db()
+    alert_writer.start()
+    scan_writer.start()
     print("\n" + "="*60)
     print("🚀 Data Breach Risk Detector - Backend Started")
     print("="*60)
     print("📡 Server running on: http://127.0.0.1:8000")
     print("📚 API Documentation: http://127.0.0.1:8000/docs")
     print("🎯 Frontend Dashboard: Open frontend/dashboard.html")
+    loop_module = type(asyncio.get_running_loop()).__module__
+    print(f"⚡ Event loop: {'uvloop' if loop_module.startswith('uvloop') else 'asyncio'}")
     print("="*60 + "\n")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush any alerts and scans still queued and stop the detector processes before the server exits"""
+    await scan_writer.stop()
+    await alert_writer.stop()
+    shutdown_detector_pool()
+
 if __name__ == "__main__":
     import uvicorn
     
     # Run the server
     uvicorn.run(
-        "app:app",
+        "backend.app:app",
         host="127.0.0.1",
         port=8000,
+        # loop/http "auto" are uvicorn's defaults, spelled out here: they pick uvloop
+        # and httptools (installed by uvicorn[standard]) when available and fall back
+        # to asyncio / h11 otherwise (e.g. uvloop has no Windows build)
+        loop="auto",
+        http="auto",
         reload=True  # Auto-reload on code changes (for development)
     )
@@ -4,8 +4,10 @@ Reads and processes sample log files (auth logs, API logs)
 In a real system, this would connect to actual log sources
 """
 
-import json
-from typing import List, Dict
+import os
+from typing import List, Dict, Iterator, Tuple, Optional
+
+import orjson
 
 class LogCollector:
     """Collects and processes log data from various sources"""
@@ -13,6 +15,47 @@ class LogCollector:
     def __init__(self):
         self.auth_logs_path = "sample_logs/auth_logs.json"
         self.api_logs_path = "sample_logs/api_logs.json"
+        
+        # Parsed log files: path -> ((mtime_ns, size), events)
+        self._parsed: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+    
+    @staticmethod
+    def _file_version(path: str) -> Optional[Tuple[int, int]]:
+        """A log file's (mtime_ns, size), or None if it doesn't exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def log_versions(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        """
+        Version of each log file, (auth, api), as used by _read_logs
+        Equal versions mean the collect_* methods return the same events
+        """
+        return (self._file_version(self.auth_logs_path), self._file_version(self.api_logs_path))
+    
+    def _read_logs(self, path: str) -> List[Dict]:
+        """
+        Parse a JSON log file, reusing the last parse while the file is unchanged
+        
+        The file's modification time and size are checked on every call, so
+        new log lines are picked up on the next scan. The events themselves
+        are shared between calls and must be treated as read-only.
+        """
+        key = self._file_version(path)
+        if key is None:
+            raise FileNotFoundError(path)
+        
+        cached = self._parsed.get(path)
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+        
+        with open(path, 'rb') as f:
+            logs = orjson.loads(f.read())
+        
+        self._parsed[path] = (key, logs)
+        return list(logs)
     
     def collect_auth_logs(self) -> List[Dict]:
         """
@@ -20,31 +63,48 @@ class LogCollector:
         Returns: List of authentication events
         """
         try:
-            with open(self.auth_logs_path, 'r') as f:
-                logs = json.load(f)
+            logs = self._read_logs(self.auth_logs_path)
             print(f"✓ Collected {len(logs)} authentication logs")
             return logs
         except FileNotFoundError:
             print(f"⚠ Warning: {self.auth_logs_path} not found")
             return []
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print(f"⚠ Warning: Invalid JSON in {self.auth_logs_path}")
             return []
     
+    def iter_auth_logs(self) -> Iterator[Dict]:
+        """
+        Stream authentication logs from file one event at a time
+        Memory stays bounded for large files; the result can be passed
+        straight to AuthDetector.analyze
+        
+        Needs ijson, which yields non-integer numbers as Decimal - orjson
+        can't serialize those, so convert them before storing the events
+        """
+        import ijson
+        
+        try:
+            with open(self.auth_logs_path, 'rb') as f:
+                yield from ijson.items(f, 'item')
+        except FileNotFoundError:
+            print(f"⚠ Warning: {self.auth_logs_path} not found")
+        except ijson.JSONError:
+            print(f"⚠ Warning: Invalid JSON in {self.auth_logs_path}")
+    
     def collect_api_logs(self) -> List[Dict]:
         """
         Read API access logs from file
         Returns: List of API request events
         """
         try:
-            with open(self.api_logs_path, 'r') as f:
-                logs = json.load(f)
+            logs = self._read_logs(self.api_logs_path)
             print(f"✓ Collected {len(logs)} API logs")
             return logs
         except FileNotFoundError:
             print(f"⚠ Warning: {self.api_logs_path} not found")
             return []
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print(f"⚠ Warning: Invalid JSON in {self.api_logs_path}")
             return []
     
@@ -28,9 +28,18 @@ DETECTION_CONFIG = {
     "rate_limit_threshold": 100  # API calls per minute threshold
 }
 
+# Worker processes the detectors run in during a scan (0 runs them in threads instead)
+DETECTOR_WORKERS = 3
+
 # Database Configuration
 DATABASE_PATH = "backend/database/breach_data.db"
 
+# Seconds the read-only GET endpoints may serve a cached database read
+API_CACHE_TTL = 2.0
+
+# Number of recent scans whose detection results are kept for reuse when the inputs repeat
+SCAN_CACHE_SIZE = 16
+
 # Server Configuration
 SERVER_CONFIG = {
     "host": "127.0.0.1",
@@ -38,6 +47,9 @@ SERVER_CONFIG = {
     "debug": True
 }
 
+# Level for the scan progress log (set to "WARNING" to silence it)
+LOG_LEVEL = "INFO"
+
 # Alert Severity Levels
 ALERT_SEVERITY = {
     "INFO": "INFO",
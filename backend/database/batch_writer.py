@@ -0,0 +1,127 @@
+"""
+Batch Writer
+Queues records in memory and writes them to the database in batches
+- A background task drains the queue while requests keep running
+- A batch is flushed once max_batch records are waiting or max_latency has passed
+- The blocking write function runs in a worker thread, off the event loop
+"""
+
+import asyncio
+from typing import Callable, List, Dict, Optional
+
+# Queued by stop() to tell the consumer to flush and exit
+_STOP = object()
+
+class BatchWriter:
+    """Coalesces queued records into batched calls of a write function"""
+
+    def __init__(self, write_batch: Callable[[List[Dict]], None],
+                 max_batch: int = 1000, max_latency: float = 0.01):
+        """
+        Args:
+            write_batch: Blocking function that persists a list of records
+            max_batch: Largest number of records written in one call
+            max_latency: Seconds to wait for more records before flushing
+        """
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def running(self) -> bool:
+        """True while the background consumer task is active"""
+        return self._task is not None and not self._task.done()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register callback() to run after every successful write (e.g. to drop cached reads)"""
+        self._listeners.append(callback)
+
+    def _notify_listeners(self):
+        """Run every registered after-write callback; a failing callback is reported, not fatal"""
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠ Warning: batch writer listener failed: {e}")
+
+    def start(self):
+        """Start the background consumer (must be called from the running event loop)"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the consumer"""
+        if self._task is None:
+            return
+
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception as e:
+            print(f"⚠ Warning: batch writer stopped with an error: {e}")
+        self._task = None
+        self._queue = None
+
+    async def put(self, record: Dict):
+        """Queue one record for writing"""
+        await self.put_many([record])
+
+    async def put_many(self, records: List[Dict]):
+        """
+        Queue several records for writing
+        If the consumer isn't running (e.g. outside the web app, or it has died)
+        they are written immediately
+        """
+        if not records:
+            return
+
+        if self._task is None or self._task.done():
+            self.write_batch(records)
+            self._notify_listeners()
+            return
+
+        for record in records:
+            await self._queue.put(record)
+
+    async def _run(self):
+        """Consumer loop: collect up to max_batch records or max_latency seconds, then write"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            record = await self._queue.get()
+            if record is _STOP:
+                break
+
+            batch = [record]
+            deadline = loop.time() + self.max_latency
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+
+            await self._flush(loop, batch)
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop, batch: List[Dict]):
+        """Write one batch in a worker thread; a failed batch is reported, not fatal"""
+        try:
+            await loop.run_in_executor(None, self.write_batch, batch)
+        except Exception as e:
+            print(f"⚠ Warning: failed to write {len(batch)} queued records: {e}")
+            return
+
+        self._notify_listeners()
@@ -1,80 +1,248 @@
 """
 Database helper functions for storing and retrieving breach detection data
-Uses simple JSON file storage for hackathon simplicity
+Uses a single SQLite file in WAL mode so writes append instead of rewriting history
+and readers never wait on the writer
 """
 
-import json
 import os
+import sqlite3
+import threading
+import uuid
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-# Database file paths
-ALERTS_DB = "backend/database/alerts.json"
-SCANS_DB = "backend/database/scans.json"
+import orjson
+
+from backend.config.settings import DATABASE_PATH
+
+# One connection per thread, opened on first use - WAL lets each thread's
+# reads run alongside another thread's write instead of queueing behind it
+_local = threading.local()
+
+# Set once the tables exist, so later calls to init_db() are free
+_initialized = False
+_init_lock = threading.Lock()
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's connection, opening it with its pragmas on first use"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _local.conn = conn
+    return conn
 
 def init_db():
-    """Initialize database files if they don't exist"""
-    for db_file in [ALERTS_DB, SCANS_DB]:
-        if not os.path.exists(db_file):
-            os.makedirs(os.path.dirname(db_file), exist_ok=True)
-            with open(db_file, 'w') as f:
-                json.dump([], f)
+    """Initialize database tables if they don't exist (only does work on the first call)"""
+    global _initialized
+    if _initialized:
+        return
+
+    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+
+    with _init_lock:
+        if _initialized:
+            return
+
+        conn = _connect()
+        # WAL mode is persistent, so it only needs to be set on the database once
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "id INTEGER PRIMARY KEY, timestamp TEXT, severity TEXT, "
+                "type TEXT, description TEXT, details_json TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scans ("
+                "id INTEGER PRIMARY KEY, scan_id TEXT, timestamp TEXT, risk_score INTEGER, "
+                "risk_level TEXT, total_issues INTEGER, data_json TEXT)"
+            )
+            # Databases created before scans had a public id need the column added
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(scans)")}
+            if "scan_id" not in columns:
+                conn.execute("ALTER TABLE scans ADD COLUMN scan_id TEXT")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_scans_scan_id ON scans(scan_id)"
+            )
+
+        _initialized = True
+
+def _dumps(data) -> str:
+    """Serialize to compact JSON text (non-string keys, e.g. a missing issue type, become strings)"""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _row_to_alert(row: sqlite3.Row) -> Dict:
+    """Convert an alerts table row back into an alert dictionary"""
+    return {
+        "id": row["id"],
+        "timestamp": row["timestamp"],
+        "severity": row["severity"],
+        "type": row["type"],
+        "description": row["description"],
+        "details": orjson.loads(row["details_json"])
+    }
 
 def save_alert(alert: Dict):
     """Save an alert to the database"""
+    save_alerts_bulk([alert])
+
+def save_alerts_bulk(new_alerts: List[Dict]):
+    """Save a batch of alerts in a single transaction"""
     init_db()
-    
-    # Read existing alerts
-    with open(ALERTS_DB, 'r') as f:
-        alerts = json.load(f)
-    
-    # Add new alert
-    alerts.append(alert)
-    
-    # Save back to file
-    with open(ALERTS_DB, 'w') as f:
-        json.dump(alerts, f, indent=2)
-
-def get_all_alerts() -> List[Dict]:
-    """Retrieve all alerts from database"""
+
+    rows = [
+        (
+            alert.get('timestamp'),
+            alert.get('severity'),
+            alert.get('type'),
+            alert.get('description'),
+            _dumps(alert.get('details'))
+        )
+        for alert in new_alerts
+    ]
+
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO alerts(timestamp, severity, type, description, details_json) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+def get_all_alerts(limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+    """
+    Retrieve alerts from database, oldest first
+
+    Args:
+        limit: Maximum number of alerts to return (None for all)
+        offset: Number of alerts to skip
+    """
     init_db()
-    
-    with open(ALERTS_DB, 'r') as f:
-        return json.load(f)
+
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT * FROM alerts ORDER BY id LIMIT ? OFFSET ?",
+        (-1 if limit is None else limit, offset)
+    ).fetchall()
+
+    return [_row_to_alert(row) for row in rows]
+
+def get_alert_severity_counts() -> Dict[str, int]:
+    """Count stored alerts per severity level"""
+    init_db()
+
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT severity, COUNT(*) FROM alerts GROUP BY severity"
+    ).fetchall()
+
+    return {severity: count for severity, count in rows}
 
 def get_recent_alerts(limit: int = 10) -> List[Dict]:
-    """Get most recent alerts"""
-    alerts = get_all_alerts()
-    return alerts[-limit:] if len(alerts) > limit else alerts
+    """Get most recent alerts (oldest first, like get_all_alerts)"""
+    init_db()
+
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT * FROM alerts ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
 
-def save_scan_result(scan_data: Dict):
-    """Save a scan result to the database"""
+    return [_row_to_alert(row) for row in reversed(rows)]
+
+def save_scan_result(scan_data: Dict) -> str:
+    """
+    Save a scan result to the database
+
+    Returns:
+        The scan's id (kept if scan_data already has one), for use with get_scan()
+    """
+    return save_scan_results_batch([scan_data])[0]
+
+def save_scan_results_batch(scans: List[Dict]) -> List[str]:
+    """
+    Save a batch of scan results in a single transaction
+
+    Returns:
+        The scans' ids, in the same order
+    """
     init_db()
-    
-    # Add timestamp
-    scan_data['timestamp'] = datetime.now().isoformat()
-    
-    # Read existing scans
-    with open(SCANS_DB, 'r') as f:
-        scans = json.load(f)
-    
-    # Add new scan
-    scans.append(scan_data)
-    
-    # Save back to file
-    with open(SCANS_DB, 'w') as f:
-        json.dump(scans, f, indent=2)
+
+    rows = []
+    for scan_data in scans:
+        # Add timestamp (unless the scan was already stamped when it finished)
+        scan_data.setdefault('timestamp', datetime.now().isoformat())
+        scan_id = scan_data.setdefault('scan_id', uuid.uuid4().hex)
+        rows.append((
+            scan_id,
+            scan_data['timestamp'],
+            scan_data.get('risk_score'),
+            scan_data.get('risk_level'),
+            scan_data.get('total_issues'),
+            _dumps(scan_data)
+        ))
+
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO scans(scan_id, timestamp, risk_score, risk_level, total_issues, data_json) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    return [row[0] for row in rows]
 
 def get_latest_scan() -> Dict:
     """Get the most recent scan result"""
     init_db()
-    
-    with open(SCANS_DB, 'r') as f:
-        scans = json.load(f)
-    
-    return scans[-1] if scans else None
+
+    conn = _connect()
+    row = conn.execute(
+        "SELECT data_json FROM scans ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+
+    return orjson.loads(row["data_json"]) if row else None
+
+def get_latest_scan_summary() -> Optional[Dict]:
+    """Get the headline fields of the most recent scan, without decoding its full result"""
+    init_db()
+
+    conn = _connect()
+    row = conn.execute(
+        "SELECT risk_score, risk_level, total_issues, timestamp "
+        "FROM scans ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+
+    return dict(row) if row else None
+
+def get_latest_scan_timestamp() -> Optional[str]:
+    """Get when the most recent scan finished, or None if there are no scans"""
+    init_db()
+
+    conn = _connect()
+    row = conn.execute(
+        "SELECT timestamp FROM scans ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+
+    return row["timestamp"] if row else None
+
+def get_scan(scan_id: str) -> Optional[Dict]:
+    """Get a saved scan result by its id, or None if there is no such scan"""
+    init_db()
+
+    conn = _connect()
+    row = conn.execute(
+        "SELECT data_json FROM scans WHERE scan_id = ?", (scan_id,)
+    ).fetchone()
+
+    return orjson.loads(row["data_json"]) if row else None
 
 def clear_alerts():
     """Clear all alerts (for testing)"""
-    with open(ALERTS_DB, 'w') as f:
-        json.dump([], f)
+    init_db()
+
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM alerts")
@@ -5,8 +5,12 @@ Detects API security issues:
 - Publicly accessible admin endpoints
 """
 
+import re
 from typing import List, Dict
 
+# Upper bound on memoized endpoint decisions
+_PROTECTED_CACHE_SIZE = 10000
+
 class APIDetector:
     """Detects API exposure and authentication issues"""
     
@@ -18,6 +22,27 @@ class APIDetector:
             "/api/users",
             "/api/data"
         ]
+        
+        # One compiled alternation scans each endpoint once for any protected path
+        self._protected_re = re.compile(
+            '|'.join(re.escape(protected) for protected in self.protected_endpoints)
+        )
+        
+        # Endpoints repeat across log lines, so remember each decision
+        self._protected_cache: Dict[str, bool] = {}
+    
+    def _is_protected(self, endpoint: str) -> bool:
+        """Check whether an endpoint falls under a protected path (memoized per endpoint)"""
+        is_protected = self._protected_cache.get(endpoint)
+        
+        if is_protected is None:
+            # Keep the cache bounded when endpoints carry ids/query strings
+            if len(self._protected_cache) >= _PROTECTED_CACHE_SIZE:
+                self._protected_cache.clear()
+            is_protected = self._protected_re.search(endpoint) is not None
+            self._protected_cache[endpoint] = is_protected
+        
+        return is_protected
     
     def detect_missing_auth(self, api_logs: List[Dict]) -> List[Dict]:
         """
@@ -33,7 +58,7 @@ class APIDetector:
             auth_token = log.get('auth_token')
             
             # Check if this is a protected endpoint
-            is_protected = any(protected in endpoint for protected in self.protected_endpoints)
+            is_protected = self._is_protected(endpoint)
             
             if is_protected and not auth_token:
                 issues.append({
@@ -6,126 +6,189 @@ Detects suspicious authentication patterns that could indicate breach attempts:
 - Multiple IPs for same user
 """
 
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional
 from datetime import datetime
 from collections import defaultdict
-import sys
-import os
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import DETECTION_CONFIG
+from backend.config.settings import DETECTION_CONFIG
+
+def _parse_hour(timestamp: Optional[str]) -> Optional[int]:
+    """
+    Extract the hour from an ISO-8601 timestamp, or None if it can't be parsed
+    
+    The common 'YYYY-MM-DDTHH:...' form is read straight from its fixed-width
+    position; anything else falls back to datetime.fromisoformat
+    (isdecimal, not isdigit: int() rejects digits like '²')
+    """
+    if not isinstance(timestamp, str):
+        return None
+    
+    if len(timestamp) >= 13 and timestamp[10] in 'T ' and timestamp[11:13].isdecimal():
+        return int(timestamp[11:13])
+    
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).hour
+    except ValueError:
+        return None
 
 class AuthDetector:
     """Detects authentication-related security issues"""
     
     def __init__(self):
         self.max_failed_logins = DETECTION_CONFIG['max_failed_logins']
-        self.suspicious_hours = DETECTION_CONFIG['suspicious_hours']
+        self.suspicious_hours = frozenset(DETECTION_CONFIG['suspicious_hours'])
     
-    def detect_brute_force(self, auth_logs: List[Dict]) -> List[Dict]:
+    def _collect(self, auth_logs: Iterable[Dict]) -> Dict:
+        """
+        Walk auth_logs once and gather everything the detectors need:
+        - failed_counts: number of failed logins per user
+        - failed_ips: set of IPs each user's failed logins came from
+        - user_ips: set of IPs each user logged in from successfully
+        - suspicious_time_logs: (log, hour) for successful logins at suspicious hours
+        """
+        failed_counts = defaultdict(int)
+        failed_ips = defaultdict(set)
+        user_ips = defaultdict(set)
+        suspicious_time_logs = []
+        
+        for log in auth_logs:
+            action = log.get('action')
+            
+            if action == 'login_failed':
+                user = log.get('user')
+                failed_counts[user] += 1
+                failed_ips[user].add(log.get('ip'))
+            elif action == 'login_success':
+                user_ips[log.get('user')].add(log.get('ip'))
+                
+                hour = _parse_hour(log.get('timestamp'))
+                if hour in self.suspicious_hours:
+                    suspicious_time_logs.append((log, hour))
+        
+        return {
+            "failed_counts": failed_counts,
+            "failed_ips": failed_ips,
+            "user_ips": user_ips,
+            "suspicious_time_logs": suspicious_time_logs
+        }
+    
+    def detect_brute_force(self, auth_logs: List[Dict], collected: Optional[Dict] = None) -> List[Dict]:
         """
         RULE: If a user has more than MAX_FAILED_LOGINS failed attempts,
         flag it as potential brute force attack
         
+        Args:
+            collected: Output of _collect(auth_logs), computed here if not given
+        
         Returns: List of detected issues
         """
         issues = []
         
-        # Count failed logins per user
-        failed_attempts = defaultdict(list)
-        
-        for log in auth_logs:
-            if log.get('action') == 'login_failed':
-                user = log.get('user')
-                failed_attempts[user].append(log)
+        if collected is None:
+            collected = self._collect(auth_logs)
         
         # Check if any user exceeds threshold
-        for user, attempts in failed_attempts.items():
-            if len(attempts) > self.max_failed_logins:
-                issues.append({
-                    "type": "brute_force_detected",
-                    "user": user,
-                    "failed_attempts": len(attempts),
-                    "ips": list(set([log.get('ip') for log in attempts])),
-                    "severity": "CRITICAL",
-                    "description": f"User '{user}' had {len(attempts)} failed login attempts"
-                })
+        for user, count in collected['failed_counts'].items():
+            if count > self.max_failed_logins:
+                issues.append(self._brute_force_issue(
+                    user, count, list(collected['failed_ips'][user])
+                ))
         
         return issues
     
-    def detect_suspicious_access_time(self, auth_logs: List[Dict]) -> List[Dict]:
+    def detect_suspicious_access_time(self, auth_logs: List[Dict], collected: Optional[Dict] = None) -> List[Dict]:
         """
         RULE: If a successful login happens during suspicious hours (midnight-5am),
         flag it as potentially suspicious
         
+        Args:
+            collected: Output of _collect(auth_logs), computed here if not given
+        
         Returns: List of detected issues
         """
         issues = []
         
-        for log in auth_logs:
-            if log.get('action') == 'login_success':
-                timestamp = log.get('timestamp')
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    hour = dt.hour
-                    
-                    if hour in self.suspicious_hours:
-                        issues.append({
-                            "type": "suspicious_access_time",
-                            "user": log.get('user'),
-                            "timestamp": timestamp,
-                            "hour": hour,
-                            "ip": log.get('ip'),
-                            "severity": "WARNING",
-                            "description": f"User '{log.get('user')}' logged in at suspicious hour {hour}:00"
-                        })
-                except Exception as e:
-                    continue
+        if collected is None:
+            collected = self._collect(auth_logs)
+        
+        for log, hour in collected['suspicious_time_logs']:
+            issues.append(self._suspicious_time_issue(
+                log.get('user'), log.get('timestamp'), hour, log.get('ip')
+            ))
         
         return issues
     
-    def detect_multiple_ip_access(self, auth_logs: List[Dict]) -> List[Dict]:
+    def detect_multiple_ip_access(self, auth_logs: List[Dict], collected: Optional[Dict] = None) -> List[Dict]:
         """
         RULE: If a user successfully logs in from multiple different IPs,
         it could indicate credential sharing or compromise
         
+        Args:
+            collected: Output of _collect(auth_logs), computed here if not given
+        
         Returns: List of detected issues
         """
         issues = []
         
-        # Group successful logins by user
-        user_ips = defaultdict(set)
-        
-        for log in auth_logs:
-            if log.get('action') == 'login_success':
-                user = log.get('user')
-                ip = log.get('ip')
-                user_ips[user].add(ip)
+        if collected is None:
+            collected = self._collect(auth_logs)
         
         # Check for users with multiple IPs
-        for user, ips in user_ips.items():
+        for user, ips in collected['user_ips'].items():
             if len(ips) > 1:
-                issues.append({
-                    "type": "multiple_ip_access",
-                    "user": user,
-                    "ip_count": len(ips),
-                    "ips": list(ips),
-                    "severity": "WARNING",
-                    "description": f"User '{user}' logged in from {len(ips)} different IPs"
-                })
+                issues.append(self._multiple_ip_issue(user, list(ips)))
         
         return issues
     
-    def analyze(self, auth_logs: List[Dict]) -> Dict:
+    def _brute_force_issue(self, user: str, failed_attempts: int, ips: List[str]) -> Dict:
+        """Build a brute force issue record"""
+        return {
+            "type": "brute_force_detected",
+            "user": user,
+            "failed_attempts": failed_attempts,
+            "ips": ips,
+            "severity": "CRITICAL",
+            "description": f"User '{user}' had {failed_attempts} failed login attempts"
+        }
+    
+    def _suspicious_time_issue(self, user: str, timestamp: str, hour: int, ip: str) -> Dict:
+        """Build a suspicious access time issue record"""
+        return {
+            "type": "suspicious_access_time",
+            "user": user,
+            "timestamp": timestamp,
+            "hour": hour,
+            "ip": ip,
+            "severity": "WARNING",
+            "description": f"User '{user}' logged in at suspicious hour {hour}:00"
+        }
+    
+    def _multiple_ip_issue(self, user: str, ips: List[str]) -> Dict:
+        """Build a multiple IP access issue record"""
+        return {
+            "type": "multiple_ip_access",
+            "user": user,
+            "ip_count": len(ips),
+            "ips": ips,
+            "severity": "WARNING",
+            "description": f"User '{user}' logged in from {len(ips)} different IPs"
+        }
+    
+    def analyze(self, auth_logs: Iterable[Dict]) -> Dict:
         """
         Run all authentication detectors and return combined results
+        
+        auth_logs may be a list or a one-shot iterator such as
+        LogCollector.iter_auth_logs()
         """
         print("\n🔍 Running Authentication Analysis...")
         
-        brute_force_issues = self.detect_brute_force(auth_logs)
-        suspicious_time_issues = self.detect_suspicious_access_time(auth_logs)
-        multiple_ip_issues = self.detect_multiple_ip_access(auth_logs)
+        # Single pass over the logs shared by all three detectors
+        collected = self._collect(auth_logs)
+        
+        brute_force_issues = self.detect_brute_force(auth_logs, collected)
+        suspicious_time_issues = self.detect_suspicious_access_time(auth_logs, collected)
+        multiple_ip_issues = self.detect_multiple_ip_access(auth_logs, collected)
         
         all_issues = brute_force_issues + suspicious_time_issues + multiple_ip_issues
         
@@ -13,7 +13,7 @@ class MisconfigDetector:
     
     def __init__(self):
         # Common default/weak usernames that should be flagged
-        self.weak_usernames = ['admin', 'root', 'administrator', 'test', 'guest']
+        self.weak_usernames = frozenset(['admin', 'root', 'administrator', 'test', 'guest'])
     
     def detect_default_credentials(self, auth_logs: List[Dict]) -> List[Dict]:
         """
@@ -0,0 +1,90 @@
+"""
+Detector Runner
+Runs the detectors in a pool of worker processes, so CPU-bound analysis
+of large log lists doesn't hold the GIL shared with the web server
+- run_* functions are top-level so the pool can pickle them
+- Each worker process imports and builds its own detector instances on
+  first use
+- The pool is started on first use and shut down with the app; a pool broken
+  by a dying worker is replaced via reset_detector_pool()
+"""
+
+import multiprocessing
+import signal
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, TYPE_CHECKING
+
+from backend.config.settings import DETECTOR_WORKERS
+
+if TYPE_CHECKING:
+    from backend.detectors.auth_detector import AuthDetector
+    from backend.detectors.api_detector import APIDetector
+    from backend.detectors.misconfig_detector import MisconfigDetector
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# One detector instance per process, imported the first time it is needed
+@lru_cache(maxsize=None)
+def _get_auth_detector() -> "AuthDetector":
+    from backend.detectors.auth_detector import AuthDetector
+    return AuthDetector()
+
+@lru_cache(maxsize=None)
+def _get_api_detector() -> "APIDetector":
+    from backend.detectors.api_detector import APIDetector
+    return APIDetector()
+
+@lru_cache(maxsize=None)
+def _get_misconfig_detector() -> "MisconfigDetector":
+    from backend.detectors.misconfig_detector import MisconfigDetector
+    return MisconfigDetector()
+
+def run_auth(auth_logs: List[Dict]) -> Dict:
+    """Run the authentication detector"""
+    return _get_auth_detector().analyze(auth_logs)
+
+def run_api(api_logs: List[Dict], endpoint_scans: List[Dict]) -> Dict:
+    """Run the API exposure detector"""
+    return _get_api_detector().analyze(api_logs, endpoint_scans)
+
+def run_misconfig(auth_logs: List[Dict], endpoint_scans: List[Dict]) -> Dict:
+    """Run the misconfiguration detector"""
+    return _get_misconfig_detector().analyze(auth_logs, endpoint_scans)
+
+def _init_worker():
+    """Leave Ctrl+C to the server, which shuts the pool down cleanly"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def get_detector_pool() -> Optional[Executor]:
+    """
+    Return the shared worker process pool, starting it on first use
+    Returns None when DETECTOR_WORKERS is 0 (callers then use their default thread pool)
+    """
+    global _pool
+    if _pool is None and DETECTOR_WORKERS:
+        # spawn, not fork: forked workers would inherit the server's threads and locks half-held
+        _pool = ProcessPoolExecutor(
+            max_workers=DETECTOR_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    return _pool
+
+def shutdown_detector_pool():
+    """Stop the worker processes (called when the app shuts down)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+def reset_detector_pool(broken: Executor):
+    """
+    Discard a pool whose worker died (BrokenProcessPool), so the next
+    get_detector_pool() starts a fresh one
+    """
+    global _pool
+    if _pool is broken:
+        _pool = None
+    # Broken pools reject new work; shutting down only reaps what is left of them
+    broken.shutdown(wait=False)
@@ -4,12 +4,13 @@ Calculates overall risk score based on detected issues
 Each issue type contributes different points to total risk
 """
 
-from typing import List, Dict
-import sys
-import os
+from collections import Counter
+from typing import List, Dict, Tuple, TYPE_CHECKING
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import RISK_WEIGHTS, RISK_THRESHOLDS
+from backend.config.settings import RISK_WEIGHTS, RISK_THRESHOLDS
+
+if TYPE_CHECKING:
+    from backend.alerts.alert_manager import AlertManager
 
 class RiskScorer:
     """Calculates risk scores based on detected security issues"""
@@ -17,6 +18,22 @@ class RiskScorer:
     def __init__(self):
         self.weights = RISK_WEIGHTS
         self.thresholds = RISK_THRESHOLDS
+        
+        # Risk levels from highest threshold to lowest, checked in order by _get_risk_level
+        self._levels_sorted = tuple(
+            sorted(self.thresholds.items(), key=lambda level: level[1], reverse=True)
+        )
+        
+        # Map issue types to weights
+        self._weight_mapping = {
+            "exposed_endpoint": self.weights['public_api_exposed'],
+            "missing_authentication": self.weights['missing_authentication'],
+            "brute_force_detected": self.weights['failed_login_attempts'],
+            "suspicious_access_time": self.weights['suspicious_access_time'],
+            "default_credentials": self.weights['weak_password'],
+            "multiple_ip_access": self.weights['multiple_ips'],
+            "public_endpoint": 10  # Lower weight for info-level issues
+        }
     
     def calculate_score(self, all_issues: List[Dict]) -> Dict:
         """
@@ -29,15 +46,34 @@ class RiskScorer:
         
         Returns: Dictionary with score, level, and breakdown
         """
+        # Count issues by type
+        issue_counts = dict(Counter(issue.get('type') for issue in all_issues))
+        
+        return self._score_counts(issue_counts, len(all_issues))
+    
+    def score_and_alert(self, all_issues: List[Dict],
+                        alert_manager: "AlertManager") -> Tuple[Dict, List[str], List[Dict]]:
+        """
+        Score issues, build recommendations and create their alerts
+        
+        Same results as calculate_score(), get_recommendations() and
+        AlertManager.process_issues(); the alerts still have to be queued
+        with alert_manager.queue_alerts().
+        
+        Returns: (risk_data, recommendations, alerts)
+        """
+        alerts = alert_manager.build_alerts(all_issues)
+        
+        risk_data = self.calculate_score(all_issues)
+        recommendations = self.get_recommendations(risk_data)
+        
+        return risk_data, recommendations, alerts
+    
+    def _score_counts(self, issue_counts: Dict[str, int], total_issues: int) -> Dict:
+        """Turn per-type issue counts into the score, level and breakdown"""
         score = 0
         breakdown = {}
         
-        # Count issues by type
-        issue_counts = {}
-        for issue in all_issues:
-            issue_type = issue.get('type')
-            issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
-        
         # Calculate score for each issue type
         for issue_type, count in issue_counts.items():
             weight = self._get_weight(issue_type)
@@ -61,35 +97,20 @@ class RiskScorer:
             "score": score,
             "risk_level": risk_level,
             "breakdown": breakdown,
-            "total_issues": len(all_issues),
+            "total_issues": total_issues,
             "issue_counts": issue_counts
         }
     
     def _get_weight(self, issue_type: str) -> int:
         """Get the risk weight for an issue type"""
-        # Map issue types to weights
-        weight_mapping = {
-            "exposed_endpoint": self.weights['public_api_exposed'],
-            "missing_authentication": self.weights['missing_authentication'],
-            "brute_force_detected": self.weights['failed_login_attempts'],
-            "suspicious_access_time": self.weights['suspicious_access_time'],
-            "default_credentials": self.weights['weak_password'],
-            "multiple_ip_access": self.weights['multiple_ips'],
-            "public_endpoint": 10  # Lower weight for info-level issues
-        }
-        
-        return weight_mapping.get(issue_type, 5)  # Default weight if not mapped
+        return self._weight_mapping.get(issue_type, 5)  # Default weight if not mapped
     
     def _get_risk_level(self, score: int) -> str:
         """Determine risk level based on score"""
-        if score >= self.thresholds['CRITICAL']:
-            return "CRITICAL"
-        elif score >= self.thresholds['HIGH']:
-            return "HIGH"
-        elif score >= self.thresholds['MEDIUM']:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        for level, threshold in self._levels_sorted:
+            if score >= threshold:
+                return level
+        return "LOW"
     
     def get_recommendations(self, risk_data: Dict) -> List[str]:
         """
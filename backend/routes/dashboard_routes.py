@@ -3,116 +3,379 @@ Dashboard API Routes
 Provides REST API endpoints for the frontend dashboard
 """
 
-from fastapi import APIRouter
-from typing import Dict
-import sys
-import os
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from collectors.log_collector import LogCollector
-from collectors.api_collector import APICollector
-from detectors.auth_detector import AuthDetector
-from detectors.api_detector import APIDetector
-from detectors.misconfig_detector import MisconfigDetector
-from risk_engine.risk_score import RiskScorer
-from alerts.alert_manager import AlertManager
-from database.db import save_scan_result, get_latest_scan, get_all_alerts
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Tuple, Callable, Any, AsyncIterator, Optional, TYPE_CHECKING
+
+import orjson
+
+from backend.detectors.runner import (
+    run_auth, run_api, run_misconfig, get_detector_pool, reset_detector_pool
+)
+from backend.alerts.alert_manager import AlertManager, alert_writer
+from backend.database.batch_writer import BatchWriter
+from backend.database.db import (
+    save_scan_results_batch, get_latest_scan_summary, get_latest_scan_timestamp, get_scan,
+    get_all_alerts, get_alert_severity_counts
+)
+from backend.config.settings import API_CACHE_TTL, SCAN_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from backend.collectors.log_collector import LogCollector
+    from backend.collectors.api_collector import APICollector
+    from backend.risk_engine.risk_score import RiskScorer
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Collectors and the scorer hold no per-scan state, so each is built once, on the
+# first scan - workers that only serve the read endpoints never import them
+# (detectors live in backend.detectors.runner, one set per worker process)
+@lru_cache(maxsize=None)
+def _get_log_collector() -> "LogCollector":
+    from backend.collectors.log_collector import LogCollector
+    return LogCollector()
+
+@lru_cache(maxsize=None)
+def _get_api_collector() -> "APICollector":
+    from backend.collectors.api_collector import APICollector
+    return APICollector()
+
+@lru_cache(maxsize=None)
+def _get_risk_scorer() -> "RiskScorer":
+    from backend.risk_engine.risk_score import RiskScorer
+    return RiskScorer()
+
+# Severity levels reported in the /alerts summary, in display order
+_SUMMARY_SEVERITIES = ('CRITICAL', 'WARNING', 'INFO')
+
+# (limit, offset) of GET /alerts when the client doesn't page
+_DEFAULT_ALERTS_PAGE = (100, 0)
+
+# Short-lived cache of database reads for the GET endpoints: key -> (expires_at, value)
+# Holds a fixed set of keys; cleared whenever a scan or a batch of alerts is written
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+def _cached(key: str, loader: Callable[[], Any]) -> Any:
+    """Return loader()'s result, reusing it for API_CACHE_TTL seconds"""
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    value = loader()
+    _cache[key] = (now + API_CACHE_TTL, value)
+    return value
+
+def _invalidate_cache():
+    """Drop all cached reads so the next request sees fresh data"""
+    _cache.clear()
+
+def _cached_latest_scan_summary() -> Dict:
+    return _cached('latest_scan_summary', get_latest_scan_summary)
+
+def _cached_latest_scan_timestamp() -> str:
+    return _cached('latest_scan_timestamp', get_latest_scan_timestamp)
+
+def _cached_alerts(limit: int, offset: int) -> List[Dict]:
+    # Only the default first page is cached, so arbitrary limit/offset pairs
+    # can't grow the cache without bound
+    if (limit, offset) != _DEFAULT_ALERTS_PAGE:
+        return get_all_alerts(limit, offset)
+    return _cached('alerts', lambda: get_all_alerts(limit, offset))
+
+def _alert_summary() -> Dict[str, int]:
+    """Alert counts per severity plus the total, aggregated by the database"""
+    severity_counts = get_alert_severity_counts()
+    summary = {severity: severity_counts.get(severity, 0) for severity in _SUMMARY_SEVERITIES}
+    summary['total'] = sum(severity_counts.values())
+    return summary
+
+def _cached_alert_summary() -> Dict[str, int]:
+    return _cached('alert_summary', _alert_summary)
+
+alert_writer.add_listener(_invalidate_cache)
+
+# Detection and scoring results of recent scans, keyed by the version of their inputs:
+# key -> (issues_by_detector, all_issues, risk_data, recommendations)
+# Least recently used entries are dropped once SCAN_CACHE_SIZE is reached
+_scan_cache: "OrderedDict[str, Tuple[Dict, List[Dict], Dict, List[str]]]" = OrderedDict()
+
+def _scan_key(log_versions: Tuple, endpoint_scans: List[Dict]) -> str:
+    """
+    Key a scan's inputs by the log files' (mtime_ns, size) plus the endpoint scan
+    Equal keys mean equal collected data, so the detection results are the same;
+    the logs themselves are never hashed
+    """
+    payload = orjson.dumps((log_versions, endpoint_scans), option=orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _get_cached_scan(key: str) -> Optional[Tuple[Dict, List[Dict], Dict, List[str]]]:
+    entry = _scan_cache.get(key)
+    if entry is not None:
+        _scan_cache.move_to_end(key)
+    return entry
+
+def _store_cached_scan(key: str, entry: Tuple[Dict, List[Dict], Dict, List[str]]):
+    _scan_cache[key] = entry
+    _scan_cache.move_to_end(key)
+    while len(_scan_cache) > SCAN_CACHE_SIZE:
+        _scan_cache.popitem(last=False)
+
+# Finished scans whose background save hasn't run yet: scan_id -> scan result
+# Lets GET /scan/{scan_id} answer straight after POST /scan returns
+_pending_scans: Dict[str, Dict] = {}
+
+# Fields of the scan result returned by POST /scan (the rest is at GET /scan/{scan_id})
+_SCAN_SUMMARY_FIELDS = (
+    "scan_completed", "scan_id", "risk_score", "risk_level", "total_issues", "issues_by_detector"
+)
+
+# Fields of the scan result repeated in the final event of /scan/stream
+_STREAM_COMPLETE_FIELDS = ("scan_completed", "scan_id", "risk_score", "risk_level", "total_issues")
+
+# Static parts of the / and /status responses, built once
+_ROOT_RESPONSE = {
+    "message": "Data Breach Risk Detector API",
+    "version": "1.0.0",
+    "status": "running"
+}
+_DETECTORS = ("auth", "api", "misconfig")
+_COLLECTORS = ("logs", "api_scanner")
+
+async def _run_detectors(auth_logs: List[Dict], api_logs: List[Dict],
+                         endpoint_scans: List[Dict]) -> Tuple[Dict, Dict, Dict]:
+    """
+    Run the three detectors in the worker process pool, in parallel
+    
+    If a worker dies (e.g. out of memory on a huge log list) the pool is broken
+    for good, so it is replaced and the detectors are retried once on the new one;
+    a second failure is reported as 503
+    """
+    loop = asyncio.get_running_loop()
+    
+    for attempt in range(2):
+        pool = get_detector_pool()
+        try:
+            return await asyncio.gather(
+                loop.run_in_executor(pool, run_auth, auth_logs),
+                loop.run_in_executor(pool, run_api, api_logs, endpoint_scans),
+                loop.run_in_executor(pool, run_misconfig, auth_logs, endpoint_scans)
+            )
+        except BrokenProcessPool:
+            reset_detector_pool(pool)
+            if attempt:
+                raise HTTPException(status_code=503, detail="Detector workers crashed; try the scan again")
+            logger.warning("   A detector worker died - restarting the worker pool and retrying")
 
 @router.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Data Breach Risk Detector API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+    return _ROOT_RESPONSE
 
-@router.post("/scan")
-async def run_scan() -> Dict:
+async def _scan_stages() -> AsyncIterator[Tuple[str, Dict]]:
     """
-    Run a complete security scan
+    Run a complete security scan, yielding (stage, payload) as each stage finishes
     
-    This endpoint:
-    1. Collects logs and API data
-    2. Runs all detectors
-    3. Calculates risk score
-    4. Generates alerts
+    Stages:
+    1. collect  - how much data was collected
+    2. detect   - issues found by each detector
+    3. score    - risk score, breakdown and recommendations
+    4. alerts   - alert summary
+    5. complete - the full scan result
     
-    Returns:
-        Complete scan results with risk score and detected issues
+    The result is not saved here; callers hand it to _schedule_persist()
+    so the write stays off the response path.
     """
-    print("\n" + "="*60)
-    print("🚀 STARTING SECURITY SCAN")
-    print("="*60)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n%s\n🚀 STARTING SECURITY SCAN\n%s", "="*60, "="*60)
     
     # Step 1: Collect data
-    print("\n📥 Step 1: Collecting Data...")
-    log_collector = LogCollector()
-    api_collector = APICollector()
-    
-    auth_logs = log_collector.collect_auth_logs()
-    api_logs = log_collector.collect_api_logs()
-    endpoint_scans = api_collector.scan_endpoints()
+    logger.info("\n📥 Step 1: Collecting Data...")
+    # Collectors are independent, so run them concurrently in worker threads
+    loop = asyncio.get_running_loop()
+    log_collector = _get_log_collector()
+    log_versions = log_collector.log_versions()
+    auth_logs, api_logs, endpoint_scans = await asyncio.gather(
+        loop.run_in_executor(None, log_collector.collect_auth_logs),
+        loop.run_in_executor(None, log_collector.collect_api_logs),
+        loop.run_in_executor(None, _get_api_collector().scan_endpoints)
+    )
+    yield "collect", {
+        "auth_logs": len(auth_logs),
+        "api_logs": len(api_logs),
+        "endpoints_scanned": len(endpoint_scans)
+    }
     
     # Step 2: Run detectors
-    print("\n🔍 Step 2: Running Security Detectors...")
-    auth_detector = AuthDetector()
-    api_detector = APIDetector()
-    misconfig_detector = MisconfigDetector()
-    
-    auth_results = auth_detector.analyze(auth_logs)
-    api_results = api_detector.analyze(api_logs, endpoint_scans)
-    misconfig_results = misconfig_detector.analyze(auth_logs, endpoint_scans)
-    
-    # Combine all issues
-    all_issues = (
-        auth_results['issues'] + 
-        api_results['issues'] + 
-        misconfig_results['issues']
-    )
+    logger.info("\n🔍 Step 2: Running Security Detectors...")
+    # Detection and scoring are deterministic, so unchanged inputs reuse an earlier result
+    # (skipped if a log file changed while it was being collected)
+    if log_collector.log_versions() == log_versions:
+        scan_key = _scan_key(log_versions, endpoint_scans)
+        cached_scan = _get_cached_scan(scan_key)
+    else:
+        scan_key = cached_scan = None
     
-    # Step 3: Calculate risk score
-    print("\n📊 Step 3: Calculating Risk Score...")
-    risk_scorer = RiskScorer()
-    risk_data = risk_scorer.calculate_score(all_issues)
-    recommendations = risk_scorer.get_recommendations(risk_data)
+    if cached_scan is not None:
+        logger.info("   Inputs unchanged since an earlier scan - reusing its results")
+        issues_by_detector, all_issues, risk_data, recommendations = cached_scan
+    else:
+        # Detectors are CPU-bound and only read the collected data, so each runs
+        # in its own worker process, in parallel and outside the server's GIL
+        auth_results, api_results, misconfig_results = await _run_detectors(
+            auth_logs, api_logs, endpoint_scans
+        )
+        
+        # Combine all issues in one pass (chained + would copy the first two lists twice)
+        # It stays a list: it is scored, alerted on and returned in the response
+        all_issues = [
+            *auth_results['issues'],
+            *api_results['issues'],
+            *misconfig_results['issues']
+        ]
+        issues_by_detector = {
+            "authentication": auth_results['total_issues'],
+            "api_security": api_results['total_issues'],
+            "misconfiguration": misconfig_results['total_issues']
+        }
+    total_issues = sum(issues_by_detector.values())
+    yield "detect", {
+        "issues_by_detector": issues_by_detector,
+        "all_issues": all_issues
+    }
     
-    # Step 4: Generate alerts
-    print("\n🚨 Step 4: Generating Alerts...")
+    # Step 3: Calculate risk score and generate alerts in one pass over the issues
+    logger.info("\n📊 Step 3: Calculating Risk Score and Generating Alerts...")
+    # AlertManager keeps a per-scan alert history, so it stays per request
     alert_manager = AlertManager()
-    alerts = alert_manager.process_issues(all_issues)
+    if cached_scan is not None:
+        # Every scan still raises its own alerts, even when the score is reused
+        alerts = await alert_manager.process_issues(all_issues)
+    else:
+        risk_data, recommendations, alerts = _get_risk_scorer().score_and_alert(all_issues, alert_manager)
+        await alert_manager.queue_alerts(alerts)
+        if scan_key is not None:
+            _store_cached_scan(scan_key, (issues_by_detector, all_issues, risk_data, recommendations))
+    yield "score", {
+        "risk_score": risk_data['score'],
+        "risk_level": risk_data['risk_level'],
+        "risk_breakdown": risk_data['breakdown'],
+        "recommendations": recommendations
+    }
+    
     alert_summary = alert_manager.get_alert_summary(alerts)
+    yield "alerts", {"alert_summary": alert_summary}
     
     # Prepare results
     scan_results = {
         "scan_completed": True,
+        "scan_id": uuid.uuid4().hex,
         "risk_score": risk_data['score'],
         "risk_level": risk_data['risk_level'],
-        "total_issues": len(all_issues),
-        "issues_by_detector": {
-            "authentication": auth_results['total_issues'],
-            "api_security": api_results['total_issues'],
-            "misconfiguration": misconfig_results['total_issues']
-        },
+        "timestamp": datetime.now().isoformat(),
+        "total_issues": total_issues,
+        "issues_by_detector": issues_by_detector,
         "all_issues": all_issues,
         "alert_summary": alert_summary,
         "recommendations": recommendations,
         "risk_breakdown": risk_data['breakdown']
     }
     
-    # Save scan to database
-    save_scan_result(scan_results)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "\n%s\n✅ SCAN COMPLETED\n   Risk Level: %s\n   Total Issues: %d\n%s",
+            "="*60, risk_data['risk_level'], total_issues, "="*60
+        )
+    
+    yield "complete", scan_results
+
+def _persist_scans(scans: List[Dict]):
+    """Save a batch of finished scans (runs in a worker thread)"""
+    try:
+        save_scan_results_batch(scans)
+    finally:
+        # A failed batch is reported by the writer; don't keep its results around forever
+        for scan_results in scans:
+            _pending_scans.pop(scan_results['scan_id'], None)
+
+# Background writer for scan results, so frequent scans share insert transactions;
+# started and stopped with the app (see app.py)
+scan_writer = BatchWriter(_persist_scans, max_batch=100)
+scan_writer.add_listener(_invalidate_cache)
+
+def _schedule_persist(background_tasks: BackgroundTasks, scan_results: Dict):
+    """Keep a finished scan readable by id and queue it for saving once the response is sent"""
+    _pending_scans[scan_results['scan_id']] = scan_results
+    background_tasks.add_task(scan_writer.put, scan_results)
+
+@router.post("/scan")
+async def run_scan(background_tasks: BackgroundTasks) -> Dict:
+    """
+    Run a complete security scan
+    
+    This endpoint:
+    1. Collects logs and API data
+    2. Runs all detectors
+    3. Calculates risk score
+    4. Generates alerts
+    
+    The scan is saved to the database after the response has been sent.
+    
+    Returns:
+        Scan summary with risk score, issue totals and the scan_id
+        to fetch the detected issues from GET /scan/{scan_id}
+    """
+    async for stage, payload in _scan_stages():
+        if stage == "complete":
+            _schedule_persist(background_tasks, payload)
+            return {key: payload[key] for key in _SCAN_SUMMARY_FIELDS}
+
+@router.post("/scan/stream")
+async def run_scan_stream(background_tasks: BackgroundTasks) -> StreamingResponse:
+    """
+    Run a complete security scan, streaming progress as Server-Sent Events
     
-    print("\n" + "="*60)
-    print("✅ SCAN COMPLETED")
-    print(f"   Risk Level: {risk_data['risk_level']}")
-    print(f"   Total Issues: {len(all_issues)}")
-    print("="*60)
+    Emits one event per stage (collect, detect, score, alerts) as soon as
+    it finishes, so clients see results before the whole scan is done.
+    The final 'complete' event only carries the headline numbers, since
+    the issues and recommendations were already sent by earlier events.
+    The scan is saved once the stream has finished.
+    """
+    async def events():
+        async for stage, payload in _scan_stages():
+            if stage == "complete":
+                # Background tasks run after the last chunk, so adding it mid-stream is fine
+                _schedule_persist(background_tasks, payload)
+                payload = {key: payload[key] for key in _STREAM_COMPLETE_FIELDS}
+            yield f"event: {stage}\ndata: {orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()}\n\n"
     
-    return scan_results
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/scan/{scan_id}")
+async def get_scan_result(scan_id: str) -> Dict:
+    """
+    Get the full result of a scan
+    
+    Returns:
+        Everything the scan produced: issues, alert summary,
+        recommendations and risk breakdown
+    """
+    scan = _pending_scans.get(scan_id) or get_scan(scan_id)
+    
+    if scan is None:
+        raise HTTPException(status_code=404, detail=f"Scan '{scan_id}' not found")
+    
+    return scan
 
 @router.get("/risk")
 async def get_risk_score() -> Dict:
@@ -122,7 +385,8 @@ async def get_risk_score() -> Dict:
     Returns:
         Current risk level and score
     """
-    latest_scan = get_latest_scan()
+    # Only the headline columns are read, not the scan's full stored result
+    latest_scan = _cached_latest_scan_summary()
     
     if not latest_scan:
         return {
@@ -139,32 +403,30 @@ async def get_risk_score() -> Dict:
     }
 
 @router.get("/alerts")
-async def get_alerts() -> Dict:
+async def get_alerts(
+    limit: int = Query(_DEFAULT_ALERTS_PAGE[0], ge=1, le=1000),
+    offset: int = Query(_DEFAULT_ALERTS_PAGE[1], ge=0)
+) -> Dict:
     """
-    Get all security alerts
+    Get security alerts, one page at a time
+    
+    Args:
+        limit: Maximum number of alerts to return
+        offset: Number of alerts to skip (oldest first)
     
     Returns:
-        List of all alerts with severity levels
+        Page of alerts with severity levels, plus a summary over all alerts
     """
-    all_alerts = get_all_alerts()
-    
-    # Generate summary
-    summary = {
-        'CRITICAL': 0,
-        'WARNING': 0,
-        'INFO': 0,
-        'total': len(all_alerts)
-    }
-    
-    for alert in all_alerts:
-        severity = alert.get('severity', 'INFO')
-        if severity in summary:
-            summary[severity] += 1
+    # Severity counts are aggregated by the database, and the summary built from
+    # them is cached alongside the other reads rather than rebuilt per request
+    summary = _cached_alert_summary()
     
     return {
-        "total_alerts": len(all_alerts),
+        "total_alerts": summary['total'],
         "summary": summary,
-        "alerts": all_alerts
+        "limit": limit,
+        "offset": offset,
+        "alerts": _cached_alerts(limit, offset)
     }
 
 @router.get("/status")
@@ -175,11 +437,9 @@ async def get_system_status() -> Dict:
     Returns:
         System status information
     """
-    latest_scan = get_latest_scan()
-    
     return {
         "system": "operational",
-        "last_scan": latest_scan.get('timestamp') if latest_scan else None,
-        "detectors": ["auth", "api", "misconfig"],
-        "collectors": ["logs", "api_scanner"]
+        "last_scan": _cached_latest_scan_timestamp(),
+        "detectors": _DETECTORS,
+        "collectors": _COLLECTORS
     }
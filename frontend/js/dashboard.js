@@ -45,7 +45,16 @@ async function runSecurityScan() {
             throw new Error('Scan failed');
         }
 
-        const data = await response.json();
+        const summary = await response.json();
+
+        // The scan response is a summary; fetch the issues and recommendations
+        const detailsResponse = await fetch(`${API_BASE_URL}/scan/${summary.scan_id}`);
+
+        if (!detailsResponse.ok) {
+            throw new Error('Failed to load scan results');
+        }
+
+        const data = await detailsResponse.json();
 
         // Update dashboard with results
         updateDashboard(data);